@@ -1,16 +1,67 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
-import json
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse
+import orjson
 import uvicorn
 import os
-import glob
-from typing import Optional
+import re
+import stat
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from functools import lru_cache
+from datetime import datetime
+from email.utils import formatdate
+from typing import Any, Callable, Optional
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick необязателен - без него слова ищутся по отдельности
+    ahocorasick = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # brotli-asgi необязателен - без него ответы сжимаются только gzip
+    BrotliMiddleware = None
+
+
+class ItemView:
+    """Элемент файла вместе с категорией, без копирования словаря элемента
+
+    Поле category добавляется только при сериализации ответа (см. orjson_default).
+    """
+    __slots__ = ("category", "item")
+
+    def __init__(self, category: str, item: dict):
+        self.category = category
+        self.item = item
+
+
+def orjson_default(obj: Any):
+    """Сериализация типов, которые orjson не знает"""
+    if isinstance(obj, ItemView):
+        return {**obj.item, "category": obj.category}
+    raise TypeError
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON ответ, сериализуемый через orjson (сразу в UTF-8 байты)
+
+    Эндпоинты возвращают его явно: так FastAPI не прогоняет результат через
+    jsonable_encoder, и ответ сериализуется ровно один раз.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=orjson_default)
 
 
 app = FastAPI(
     title="Korean Words API",
-    version="1.0"
+    version="1.0",
+    default_response_class=ORJSONResponse
 )
 
 # Настройка CORS - обязательно для мобильных приложений
@@ -22,59 +73,440 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Сжатие ответов: JSON с корейским текстом сжимается в несколько раз
+if BrotliMiddleware is not None:
+    # Brotli для клиентов с "br" в Accept-Encoding, остальным - gzip
+    app.add_middleware(BrotliMiddleware, minimum_size=512)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # Путь к JSON файлам
 CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
 JSON_DIR = os.path.join(CURRENT_DIR, "data")
 
+# Отладочные эндпоинты (/debug/...) включаются переменной окружения API_DEBUG=1
+DEBUG_ENDPOINTS = os.environ.get("API_DEBUG") == "1"
+
+
+@dataclass
+class CachedFile:
+    """Распарсенный JSON файл вместе с индексами, построенными при загрузке"""
+    mtime_ns: int
+    size: int
+    data: Any
+    id_index: dict[int, int]  # id элемента -> позиция в flat_items
+    flat_items: list[tuple[str, dict]]  # все элементы файла: (категория, элемент)
+    learned_flags: bytearray  # 1, если элемент выучен; параллельно flat_items
+    # Категории файла: (название, начало, конец в flat_items, элементы); None - нет 'words'
+    category_spans: Optional[list[tuple[str, int, int, list]]]
+    search_text: str  # текстовые поля всех элементов (casefold) одной строкой
+    search_offsets: array  # начало каждого элемента flat_items внутри search_text
+    stats: Optional[dict] = None  # готовая статистика для /stats
+    categories: Optional[list] = None  # готовый список категорий для /categories
+    # Значения отдельных полей для поиска с field=..., строятся по запросу:
+    # поле -> (список значений, все ли значения строковые)
+    field_values: dict[str, tuple[list[tuple[str, str, dict]], bool]] = field(default_factory=dict)
+
+
+# Разделители полей и элементов в поисковой строке файла
+SEARCH_SEPARATOR = "\x1f"
+ITEM_SEPARATOR = "\x00"
+
+# Кэш распарсенных файлов: имя файла -> CachedFile
+_FILE_CACHE: dict[str, CachedFile] = {}
+
+# Эндпоинты выполняются в пуле потоков - изменения файлов выполняем по одному
+_UPDATE_LOCK = threading.Lock()
+
+# Кэш списка файлов: (mtime_ns папки, список файлов, готовые тела ответов по нему)
+_DIR_CACHE: Optional[tuple[int, list, dict[str, bytes]]] = None
+
 
 # ------------------- Утилиты -------------------
 
+def is_json_file_name(filename: str) -> bool:
+    """Можно ли отдавать файл с таким именем (только *.json, без временных файлов)"""
+    return filename.endswith(".json")
+
+
+def load_dir_listing() -> tuple[Optional[int], list, dict[str, bytes]]:
+    """Снимок папки data: (mtime_ns папки, список файлов, готовые тела ответов)
+
+    Список пересканируется только при изменении папки. Тела ответов хранятся
+    в том же снимке, поэтому не могут пережить список, по которому построены.
+    """
+    global _DIR_CACHE
+    try:
+        mtime_ns = os.stat(JSON_DIR).st_mtime_ns
+        listing = _DIR_CACHE
+        if listing is not None and listing[0] == mtime_ns:
+            return listing
+
+        with os.scandir(JSON_DIR) as entries:
+            files = [
+                {
+                    "name": entry.name,
+                    "path": entry.path,
+                    "url": f"/file/{entry.name}"
+                }
+                for entry in entries
+                # Скрытые файлы пропускаем, как это делал glob("*.json")
+                if entry.name.endswith(".json") and not entry.name.startswith(".") and entry.is_file()
+            ]
+    except FileNotFoundError:
+        # Папки data нет - файлов нет (кэш не трогаем, папка может появиться)
+        return None, [], {}
+
+    listing = (mtime_ns, files, {})
+    _DIR_CACHE = listing
+    return listing
+
+
 def get_all_json_files():
     """Получить все JSON файлы в текущей директории"""
-    files = []
-    for file_path in glob.glob(os.path.join(JSON_DIR, "*.json")):
-        file_name = os.path.basename(file_path)
-        files.append({
-            "name": file_name,
-            "path": file_path,
-            "url": f"/file/{file_name}"
+    return load_dir_listing()[1]
+
+
+def dir_listing_response(key: str, build_body: Callable[[list], dict]) -> Response:
+    """Ответ, зависящий только от списка файлов: тело сериализуется один раз"""
+    _, files, bodies = load_dir_listing()
+    body = bodies.get(key)
+    if body is None:
+        body = orjson.dumps(build_body(files))
+        bodies[key] = body
+    return Response(content=body, media_type="application/json")
+
+
+def normalize_category(category: dict) -> tuple[str, list]:
+    """Привести категорию к единому виду при загрузке файла
+
+    Возвращается настоящий список items (пустой, если в файле его нет - в сами
+    данные он не записывается), а название интернируется - одинаковые
+    названия становятся одной строкой.
+    """
+    items = category.get("items")
+    if not isinstance(items, list):
+        items = []
+    category_name = category.get("category", "")
+    if isinstance(category_name, str):
+        category_name = sys.intern(category_name)
+        if "category" in category:
+            category["category"] = category_name
+    return category_name, items
+
+
+def build_cached_file(data: Any, st: os.stat_result) -> CachedFile:
+    """Построить индексы по файлу за один проход по элементам"""
+    id_index = {}
+    flat_items = []
+    learned_flags = bytearray()
+    category_spans = None
+    search_blobs = []
+    search_offsets = array("i")
+    position = 0
+
+    # Файл неожиданной формы не ломает загрузку: лишнее пропускаем, а без
+    # списка 'words' эндпоинты со структурой отвечают 400
+    if isinstance(data, dict) and isinstance(data.get("words"), list):
+        category_spans = []
+        for category in data["words"]:
+            if not isinstance(category, dict):
+                continue
+            category_name, items = normalize_category(category)
+            start = len(flat_items)
+
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    id_index.setdefault(item.get("id"), len(flat_items))
+                except TypeError:  # нехэшируемый id - по нему элемент не найти
+                    pass
+                flat_items.append((category_name, item))
+                learned_flags.append(1 if item.get("learned", False) else 0)
+                blob = SEARCH_SEPARATOR.join(
+                    value.casefold() for value in item.values() if isinstance(value, str)
+                )
+                search_blobs.append(blob)
+                search_offsets.append(position)
+                position += len(blob) + len(ITEM_SEPARATOR)
+
+            category_spans.append((category_name, start, len(flat_items), items))
+
+    search_text = ITEM_SEPARATOR.join(search_blobs)
+    cached = CachedFile(st.st_mtime_ns, st.st_size, data, id_index, flat_items,
+                        learned_flags, category_spans, search_text, search_offsets)
+    refresh_stats(cached)
+    return cached
+
+
+def refresh_stats(cached: CachedFile):
+    """Пересчитать статистику и список категорий по learned_flags
+
+    Выученные элементы считаются через bytearray.count - без обращения к словарям элементов.
+    """
+    if cached.category_spans is None:
+        return
+
+    flags = cached.learned_flags
+    total_items = len(flags)
+    total_learned = flags.count(1)
+    categories_stats = []
+    categories = []
+
+    for category_name, start, end, items in cached.category_spans:
+        category_total = end - start
+        category_learned = flags.count(1, start, end)
+
+        categories_stats.append({
+            "category": category_name,
+            "total": category_total,
+            "learned": category_learned,
+            "percentage": round((category_learned / category_total * 100) if category_total > 0 else 0, 1)
         })
-    return files
+        categories.append({
+            "name": category_name,
+            "item_count": category_total,
+            "learned_count": category_learned,
+            "items": items[:5]  # Первые 5 элементов для предпросмотра
+        })
+
+    overall_percentage = round((total_learned / total_items * 100) if total_items > 0 else 0, 1)
+    cached.stats = {
+        "overall": {
+            "total_items": total_items,
+            "learned_items": total_learned,
+            "remaining": total_items - total_learned,
+            "percentage": overall_percentage
+        },
+        "by_category": categories_stats
+    }
+    cached.categories = categories
 
 
-def load_json_file(filename: str):
-    """Загрузить КОНКРЕТНЫЙ JSON файл"""
+def find_matching_items(cached: CachedFile, query: str) -> list[int]:
+    """Индексы элементов flat_items, текст которых содержит подстроку"""
+    pattern = re.compile(re.escape(query))
+    text = cached.search_text
+    offsets = cached.search_offsets
+    matches = []
+    pos = 0
+
+    while True:
+        match = pattern.search(text, pos)
+        if match is None:
+            break
+        index = bisect_right(offsets, match.start()) - 1
+        matches.append(index)
+        # Остальные совпадения в этом же элементе не нужны - переходим к следующему
+        if index + 1 >= len(offsets):
+            break
+        pos = offsets[index + 1]
+
+    return matches
+
+
+def find_items_with_all_terms(cached: CachedFile, terms: list[str]) -> list[int]:
+    """Индексы элементов flat_items, текст которых содержит каждое из слов"""
+    if any(not term or SEARCH_SEPARATOR in term or ITEM_SEPARATOR in term for term in terms):
+        # Пустой запрос или разделители в запросе дали бы ложные совпадения
+        # в общей строке - проверяем строковые поля элементов напрямую
+        return [
+            index for index, (_, item) in enumerate(cached.flat_items)
+            if all(
+                any(isinstance(value, str) and term in value.casefold() for value in item.values())
+                for term in terms
+            )
+        ]
+
+    if len(terms) == 1:
+        return find_matching_items(cached, terms[0])
+
+    if ahocorasick is None:
+        # Без pyahocorasick - отдельный проход по тексту на каждое слово
+        found = set(find_matching_items(cached, terms[0]))
+        for term in terms[1:]:
+            found.intersection_update(find_matching_items(cached, term))
+        return sorted(found)
+
+    # Все слова ищутся одним проходом автомата Ахо-Корасик
+    automaton = ahocorasick.Automaton()
+    for term_index, term in enumerate(terms):
+        automaton.add_word(term, (term_index, len(term)))
+    automaton.make_automaton()
+
+    offsets = cached.search_offsets
+    hits: dict[int, set[int]] = {}
+    for end, (term_index, term_length) in automaton.iter(cached.search_text):
+        index = bisect_right(offsets, end - term_length + 1) - 1
+        hits.setdefault(index, set()).add(term_index)
+
+    terms_count = len(set(terms))
+    return sorted(index for index, found in hits.items() if len(found) == terms_count)
+
+
+def get_field_values(cached: CachedFile, field_name: str) -> tuple[list[tuple[str, str, dict]], bool]:
+    """Значения поля без учёта регистра (casefold): (значение, категория, элемент)
+
+    Второй элемент результата - True, если все значения поля строковые
+    (тогда они целиком входят в cached.search_text).
+    """
+    entry = cached.field_values.get(field_name)
+    if entry is None:
+        values = []
+        all_text = True
+        for category_name, item in cached.flat_items:
+            if field_name in item:
+                value = item[field_name]
+                all_text = all_text and isinstance(value, str)
+                values.append((str(value).casefold(), category_name, item))
+        entry = (values, all_text)
+        cached.field_values[field_name] = entry
+    return entry
+
+
+@lru_cache(maxsize=1024)
+def split_pointer(pointer: str) -> tuple[str, ...]:
+    """Разбить указатель вида words/0/items/3/korean на части
+
+    Ведущий '/' необязателен, ~1 и ~0 раскрываются в '/' и '~' как в RFC 6901.
+    """
+    if pointer.startswith("/"):
+        pointer = pointer[1:]
+    if not pointer:
+        return ()
+    return tuple(part.replace("~1", "/").replace("~0", "~") for part in pointer.split("/"))
+
+
+def resolve_pointer(obj: Any, parts: tuple[str, ...]) -> Any:
+    """Пройти по данным файла по частям указателя; KeyError, если пути нет"""
+    for part in parts:
+        if isinstance(obj, list):
+            # Индекс массива - "0" или ASCII цифры без ведущего нуля (RFC 6901)
+            if (not (part == "0" or (part.isascii() and part.isdigit() and part[0] != "0"))
+                    or int(part) >= len(obj)):
+                raise KeyError(part)
+            obj = obj[int(part)]
+        elif isinstance(obj, dict):
+            obj = obj[part]
+        else:
+            raise KeyError(part)
+    return obj
+
+
+def is_cache_fresh(cached: Optional[CachedFile], st: os.stat_result) -> bool:
+    """Соответствует ли запись кэша этой версии файла"""
+    return cached is not None and cached.mtime_ns == st.st_mtime_ns and cached.size == st.st_size
+
+
+def cache_file_content(filename: str, st: os.stat_result, content: bytes) -> Optional[CachedFile]:
+    """Разобрать прочитанное содержимое файла и положить его в кэш"""
+    try:
+        data = orjson.loads(content)
+    except Exception as e:
+        print(f"Error loading {filename}: {e}")
+        return None
+
+    cached = build_cached_file(data, st)
+    _FILE_CACHE[filename] = cached
+    return cached
+
+
+def load_cached_file(filename: str) -> Optional[CachedFile]:
+    """Загрузить JSON файл вместе с индексами (из кэша, если файл не менялся)
+
+    Данные в кэше общие для всех запросов - изменять их может только update_item.
+    """
     file_path = os.path.join(JSON_DIR, filename)
-    if not os.path.exists(file_path):
+    try:
+        st = os.stat(file_path)
+    except OSError:
         return None
 
+    cached = _FILE_CACHE.get(filename)
+    if is_cache_fresh(cached, st):
+        return cached
+
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
+        with open(file_path, 'rb') as f:
+            # Версию берём у открытого файла - он мог смениться после os.stat
+            st = os.fstat(f.fileno())
+            content = f.read()
+    except OSError as e:
         print(f"Error loading {filename}: {e}")
         return None
 
+    return cache_file_content(filename, st, content)
+
 
-def save_json_file(filename: str, data: dict):
-    """Сохранить данные в JSON файл"""
+def load_json_file(filename: str):
+    """Загрузить КОНКРЕТНЫЙ JSON файл"""
+    cached = load_cached_file(filename)
+    return cached.data if cached is not None else None
+
+
+def save_json_file(filename: str, data: dict, reindex: bool = True):
+    """Сохранить данные в JSON файл
+
+    Данные пишутся во временный файл одним вызовом write() и затем атомарно
+    подменяют исходный - при сбое посреди записи старый файл остаётся целым.
+    reindex=False - индексы в кэше уже обновлены вызывающим кодом.
+    """
     file_path = os.path.join(JSON_DIR, filename)
+    tmp_path = file_path + ".tmp"
     try:
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        # Файлы читает приложение, а не человек - пишем компактно (см. /debug/dump при API_DEBUG=1)
+        buf = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+        with open(tmp_path, 'wb') as f:
+            f.write(buf)
+        os.replace(tmp_path, file_path)
+
+        st = os.stat(file_path)
+        cached = _FILE_CACHE.get(filename)
+        if not reindex and cached is not None and cached.data is data:
+            cached.mtime_ns = st.st_mtime_ns
+            cached.size = st.st_size
+        else:
+            # Перестраиваем индексы по сохранённым данным, чтобы не перечитывать файл
+            _FILE_CACHE[filename] = build_cached_file(data, st)
         return True
     except Exception as e:
+        # Данные в памяти могли уже измениться - перечитаем файл при следующем запросе
+        _FILE_CACHE.pop(filename, None)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
         print(f"Error saving {filename}: {e}")
         return False
 
 
+def cache_headers(mtime_ns: int, size: int) -> dict:
+    """HTTP заголовки версии файла для условных запросов клиента"""
+    return {
+        "ETag": f'W/"{mtime_ns}-{size}"',
+        "Last-Modified": formatdate(mtime_ns / 1e9, usegmt=True),
+        # Клиент может хранить ответ, но перед использованием должен его перепроверить
+        "Cache-Control": "no-cache"
+    }
+
+
+def not_modified(request: Request, headers: dict) -> Optional[Response]:
+    """Ответ 304, если у клиента уже есть эта версия (по If-None-Match)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is None:
+        return None
+
+    etags = {tag.strip() for tag in if_none_match.split(",")}
+    if headers["ETag"] in etags or "*" in etags:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
 # ------------------- Простые эндпоинты -------------------
 
 @app.get("/")
-async def root():
+def root():
     """Корневой эндпоинт - информация об API"""
-    files = get_all_json_files()
-    return {
+    return dir_listing_response("root", lambda files: {
         "api": "Korean Words API",
         "version": "1.0",
         "description": "Простой API для мобильного приложения на Kotlin",
@@ -84,253 +516,267 @@ async def root():
             "Обновить значение по id_items в файле ": "/update/{filename}/{item_id}",
             "search": "/search/{filename}?q={query}",
             "stats": "/stats/{filename}",
+            "Значение по пути в файле": "/value/{filename}?path=words/0/items/0/korean",
             "health": "/health",
+            **({"Файл с отступами для чтения": "/debug/dump/{filename}"} if DEBUG_ENDPOINTS else {}),
             "Методы API": "/method"
         },
         "available_files": files
-    }
+    })
 
 
 @app.get("/files")
-async def list_files():
+def list_files():
     """Получить список всех доступных JSON файлов"""
-    files = get_all_json_files()
-    return {
+    return dir_listing_response("files", lambda files: {
         "success": True,
         "count": len(files),
         "files": files
-    }
+    })
 
 
 @app.get("/file/{filename}")
-async def get_file(filename: str):
-    """Получить содержимое JSON файла полностью"""
-    data = load_json_file(filename)
-    if data is None:
-        raise HTTPException(status_code=404, detail=f"File {filename} not found or invalid")
+def get_file(filename: str, request: Request):
+    """Получить содержимое JSON файла полностью (отдаётся с диска как есть)
 
-    return JSONResponse(
-        content=data,
-        headers={"Content-Type": "application/json; charset=utf-8"}
-    )
+    Заголовки версии и тело берутся у одного открытого файла: если /update
+    подменит файл через os.replace, ответ всё равно останется согласованным.
+    """
+    file_path = os.path.join(JSON_DIR, filename)
+    not_found = HTTPException(status_code=404, detail=f"File {filename} not found or invalid")
+    if not is_json_file_name(filename):
+        raise not_found
+
+    try:
+        with open(file_path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode):
+                raise not_found
+
+            headers = cache_headers(st.st_mtime_ns, st.st_size)
+            response = not_modified(request, headers)
+            if response is not None:
+                return response
+
+            content = f.read()
+    except OSError:
+        raise not_found
+
+    # Отдаём только файлы, которые удаётся разобрать (разбор кэшируется)
+    if not is_cache_fresh(_FILE_CACHE.get(filename), st) and cache_file_content(filename, st, content) is None:
+        raise not_found
+
+    return Response(content=content, media_type="application/json; charset=utf-8", headers=headers)
 
 
 @app.get("/search/{filename}")
-async def search_in_file(
+def search_in_file(
         filename: str,
         q: str,
         field: Optional[str] = None  # optional: russian, korean, example_russian, example_korean
 ):
     """Поиск по файлу"""
-    data = load_json_file(filename)
-    if data is None:
+    cached = load_cached_file(filename)
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
 
-    if "words" not in data:
+    if cached.category_spans is None:
         raise HTTPException(status_code=400, detail="Invalid file format: missing 'words' field")
 
     results = []
-    query_lower = q.lower()
-
-    for category in data["words"]:
-        category_name = category.get("category", "")
-        for item in category.get("items", []):
-            # Поиск по всем полям если field не указан
-            if field:
-                # Поиск в конкретном поле
-                if field in item:
-                    text = str(item[field]).lower()
-                    if query_lower in text:
-                        item_copy = item.copy()
-                        item_copy["category"] = category_name
-                        results.append(item_copy)
-            else:
-                # Поиск во всех текстовых полях
-                found = False
-                for key, value in item.items():
-                    if isinstance(value, str) and query_lower in value.lower():
-                        found = True
-                        break
-
-                if found:
-                    item_copy = item.copy()
-                    item_copy["category"] = category_name
-                    results.append(item_copy)
+    # Без учёта регистра (casefold корректно работает и для кириллицы);
+    # если в запросе несколько слов - элемент должен содержать их все
+    query = q.casefold()
+    terms = query.split()
+    if len(terms) <= 1:
+        terms = [query]
+
+    if field:
+        # Поиск в конкретном поле
+        values, all_text = get_field_values(cached, field)
+        # Строковые значения поля входят в общий текст файла: если подстроки нет
+        # в нём, перебирать элементы не нужно
+        if not all_text or all(term in cached.search_text for term in terms):
+            for text, category_name, item in values:
+                if all(term in text for term in terms):
+                    results.append(ItemView(category_name, item))
+    else:
+        # Поиск во всех текстовых полях
+        for index in find_items_with_all_terms(cached, terms):
+            results.append(ItemView(*cached.flat_items[index]))
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "query": q,
         "field": field,
         "filename": filename,
         "results": results,
         "count": len(results)
-    }
+    })
 
 
 @app.put("/update/{filename}/{item_id}")
-async def update_item(
+def update_item(
         filename: str,
         item_id: int,
         learned: Optional[bool] = None,
         custom_data: Optional[dict] = None
 ):
     """Обновить элемент в файле"""
-    data = load_json_file(filename)
-    if data is None:
-        raise HTTPException(status_code=404, detail=f"File {filename} not found")
-
-    if "words" not in data:
-        raise HTTPException(status_code=400, detail="Invalid file format: missing 'words' field")
-
-    item_found = False
-    updated_item = None
-
-    for category in data["words"]:
-        for item in category.get("items", []):
-            if item.get("id") == item_id:
-                item_found = True
-
-                # Обновляем поле learned если передано
-                if learned is not None:
-                    item["learned"] = learned
-
-                # Обновляем кастомные поля если переданы
-                if custom_data:
-                    for key, value in custom_data.items():
-                        item[key] = value
-
-                updated_item = item.copy()
-                updated_item["category"] = category.get("category", "")
-                break
-
-        if item_found:
-            break
-
-    if not item_found:
-        raise HTTPException(status_code=404, detail=f"Item with id {item_id} not found in {filename}")
-
-    # Сохраняем изменения
-    if save_json_file(filename, data):
-        return {
-            "success": True,
-            "message": "Item updated successfully",
-            "filename": filename,
-            "item_id": item_id,
-            "item": updated_item
-        }
-    else:
-        raise HTTPException(status_code=500, detail="Failed to save changes")
+    with _UPDATE_LOCK:
+        cached = load_cached_file(filename)
+        if cached is None:
+            raise HTTPException(status_code=404, detail=f"File {filename} not found")
+
+        data = cached.data
+        if cached.category_spans is None:
+            raise HTTPException(status_code=400, detail="Invalid file format: missing 'words' field")
+
+        position = cached.id_index.get(item_id)
+        if position is None:
+            raise HTTPException(status_code=404, detail=f"Item with id {item_id} not found in {filename}")
+
+        category_name, item = cached.flat_items[position]
+
+        # Обновляем поле learned если передано
+        if learned is not None:
+            item["learned"] = learned
+            cached.learned_flags[position] = 1 if learned else 0
+            refresh_stats(cached)
+            # Запомненные значения полей могли устареть
+            cached.field_values.clear()
+
+        # Обновляем кастомные поля если переданы
+        if custom_data:
+            for key, value in custom_data.items():
+                item[key] = value
+
+        # Сохраняем изменения; кастомные поля могут менять id и текст - тогда
+        # индексы перестраиваются целиком
+        if save_json_file(filename, data, reindex=bool(custom_data)):
+            # Ответ рендерится сразу, ещё под блокировкой - копировать элемент не нужно
+            return ORJSONResponse({
+                "success": True,
+                "message": "Item updated successfully",
+                "filename": filename,
+                "item_id": item_id,
+                "item": ItemView(category_name, item)
+            })
+        else:
+            raise HTTPException(status_code=500, detail="Failed to save changes")
 
 
 @app.get("/stats/{filename}")
-async def get_file_stats(filename: str):
+def get_file_stats(filename: str, request: Request):
     """Получить статистику по файлу"""
-    data = load_json_file(filename)
-    if data is None:
+    cached = load_cached_file(filename)
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
 
-    if "words" not in data:
+    if cached.stats is None:
         raise HTTPException(status_code=400, detail="Invalid file format: missing 'words' field")
 
-    total_items = 0
-    total_learned = 0
-    categories_stats = []
-
-    for category in data["words"]:
-        category_name = category.get("category", "")
-        items = category.get("items", [])
-        category_total = len(items)
-        category_learned = sum(1 for item in items if item.get("learned", False))
-
-        total_items += category_total
-        total_learned += category_learned
-
-        categories_stats.append({
-            "category": category_name,
-            "total": category_total,
-            "learned": category_learned,
-            "percentage": round((category_learned / category_total * 100) if category_total > 0 else 0, 1)
-        })
-
-    overall_percentage = round((total_learned / total_items * 100) if total_items > 0 else 0, 1)
+    headers = cache_headers(cached.mtime_ns, cached.size)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "filename": filename,
-        "overall": {
-            "total_items": total_items,
-            "learned_items": total_learned,
-            "remaining": total_items - total_learned,
-            "percentage": overall_percentage
-        },
-        "by_category": categories_stats
-    }
+        **cached.stats
+    }, headers=headers)
 
 
 @app.get("/health")
-async def health_check():
+def health_check():
     """Проверка здоровья API"""
     files = get_all_json_files()
-    return {
+    return ORJSONResponse({
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "available_files": len(files),
         "server": "Korean Words API"
-    }
+    })
 
 
 @app.get("/categories/{filename}")
-async def get_categories(filename: str):
+def get_categories(filename: str, request: Request):
     """Получить список категорий из файла"""
-    data = load_json_file(filename)
-    if data is None:
+    cached = load_cached_file(filename)
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
 
-    if "words" not in data:
+    if cached.categories is None:
         raise HTTPException(status_code=400, detail="Invalid file format: missing 'words' field")
 
-    categories = []
-    for category in data["words"]:
-        category_name = category.get("category", "")
-        item_count = len(category.get("items", []))
-        learned_count = sum(1 for item in category.get("items", []) if item.get("learned", False))
-
-        categories.append({
-            "name": category_name,
-            "item_count": item_count,
-            "learned_count": learned_count,
-            "items": category.get("items", [])[:5]  # Первые 5 элементов для предпросмотра
-        })
+    headers = cache_headers(cached.mtime_ns, cached.size)
+    response = not_modified(request, headers)
+    if response is not None:
+        return response
 
-    return {
+    return ORJSONResponse({
         "success": True,
         "filename": filename,
-        "categories": categories,
-        "total_categories": len(categories)
-    }
+        "categories": cached.categories,
+        "total_categories": len(cached.categories)
+    }, headers=headers)
 
 
 @app.get("/item/{filename}/{item_id}")
-async def get_item_by_id(filename: str, item_id: int):
+def get_item_by_id(filename: str, item_id: int):
     """Получить конкретный элемент по ID"""
-    data = load_json_file(filename)
-    if data is None:
+    cached = load_cached_file(filename)
+    if cached is None:
         raise HTTPException(status_code=404, detail=f"File {filename} not found")
 
-    if "words" not in data:
+    if cached.category_spans is None:
         raise HTTPException(status_code=400, detail="Invalid file format: missing 'words' field")
 
-    for category in data["words"]:
-        for item in category.get("items", []):
-            if item.get("id") == item_id:
-                result = item.copy()
-                result["category"] = category.get("category", "")
-                return {
-                    "success": True,
-                    "item": result
-                }
+    position = cached.id_index.get(item_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Item with id {item_id} not found in {filename}")
+
+    return ORJSONResponse({
+        "success": True,
+        "item": ItemView(*cached.flat_items[position])
+    })
+
+
+@app.get("/value/{filename}")
+def get_value_by_path(filename: str, path: str = ""):
+    """Получить часть файла по пути (указателю), например words/0/items/3/korean"""
+    cached = load_cached_file(filename)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"File {filename} not found")
+
+    try:
+        value = resolve_pointer(cached.data, split_pointer(path))
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Path {path} not found in {filename}")
+
+    return ORJSONResponse({
+        "success": True,
+        "filename": filename,
+        "path": path,
+        "value": value
+    })
+
+
+def debug_dump_file(filename: str):
+    """Получить JSON файл с отступами (для чтения человеком)"""
+    data = load_json_file(filename) if is_json_file_name(filename) else None
+    if data is None:
+        raise HTTPException(status_code=404, detail=f"File {filename} not found or invalid")
+
+    return Response(
+        content=orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS),
+        media_type="application/json"
+    )
+
 
-    raise HTTPException(status_code=404, detail=f"Item with id {item_id} not found in {filename}")
+if DEBUG_ENDPOINTS:
+    app.add_api_route("/debug/dump/{filename}", debug_dump_file, methods=["GET"])
 
 
 # ------------------- Запуск сервера -------------------